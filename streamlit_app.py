@@ -1,8 +1,20 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import time
+import httpx
 import requests
-import json
-from datetime import datetime
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+import orjson
+import ijson
+from itertools import islice
+from pathlib import Path
 
 # Page configuration
 st.set_page_config(
@@ -12,63 +24,103 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better styling
-st.markdown("""
-    <style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: 700;
-        color: #1f77b4;
-        margin-bottom: 1rem;
-    }
-    .section-header {
-        font-size: 1.5rem;
-        font-weight: 600;
-        color: #2c3e50;
-        margin-top: 2rem;
-        margin-bottom: 1rem;
-        border-bottom: 2px solid #1f77b4;
-        padding-bottom: 0.5rem;
-    }
-    .success-box {
-        padding: 1rem;
-        border-radius: 0.5rem;
-        background-color: #d4edda;
-        border: 1px solid #c3e6cb;
-        color: #155724;
-    }
-    .error-box {
-        padding: 1rem;
-        border-radius: 0.5rem;
-        background-color: #f8d7da;
-        border: 1px solid #f5c6cb;
-        color: #721c24;
-    }
-    .info-box {
-        padding: 1rem;
-        border-radius: 0.5rem;
-        background-color: #d1ecf1;
-        border: 1px solid #bee5eb;
-        color: #0c5460;
-    }
-    .email-item {
-        padding: 1rem;
-        border: 1px solid #dee2e6;
-        border-radius: 0.5rem;
-        margin-bottom: 0.5rem;
-        background-color: #f8f9fa;
-    }
-    .email-item:hover {
-        background-color: #e9ecef;
-        cursor: pointer;
-    }
-    </style>
-""", unsafe_allow_html=True)
+logger = logging.getLogger(__name__)
 
 # API Configuration
 MSP_API_URL = "https://cthgcqdyqplumqizjngx.supabase.co/functions/v1/msp-api"
 USER_API_URL = "https://cthgcqdyqplumqizjngx.supabase.co/functions/v1/user-api"
 
+# (connect, read) timeout in seconds for synchronous API requests
+REQUEST_TIMEOUT = (3.05, 15)
+
+# Shown instead of the raw exception so a timeout reads as worth retrying
+TIMEOUT_ERROR = "The API did not respond in time, please try again"
+
+# Custom CSS for better styling
+CSS_PATH = Path(__file__).parent / "assets" / "app.css"
+
+# Seconds that fetched API data is reused before being requested again
+CACHE_TTL = 30
+
+# Seconds a successfully authenticated API key is trusted without re-probing
+KEY_VERIFY_TTL = 600
+
+# Seconds a rejected API key's error is reused before the key is probed again
+KEY_FAILURE_TTL = 30
+
+# Raw Enbox fields rendered in the Enboxes table
+ENBOX_FIELDS = ["id", "enbox_rsync_id", "display_name", "created_via", "is_active", "created_at"]
+
+# Raw email fields rendered in the Inbox table
+EMAIL_FIELDS = ["id", "subject", "from_name", "from_enbox_id", "is_starred", "is_read", "created_at"]
+
+# Number of emails shown per inbox page
+INBOX_PAGE_SIZE = 25
+
+# Enboxes requested per list-enboxes page
+ENBOX_PAGE_SIZE = 100
+
+# Number of inbox emails whose full bodies are prefetched per render
+PREFETCH_EMAIL_COUNT = 10
+
+# Most email bodies and sender names each session keeps before dropping the oldest
+SESSION_CACHE_LIMIT = 100
+
+# Actions that change nothing server-side, so replaying one after it reached the server is harmless
+READ_ONLY_ACTIONS = frozenset([
+    "list-enboxes", "get-enbox", "get-stats", "get-usage",
+    "get-profile", "list-emails", "get-email", "list-labels", "resolve-enbox"
+])
+
+# Statuses with which a backend rejects an action it does not implement
+UNKNOWN_ACTION_STATUSES = (400, 404)
+
+# Session state owned by each API, dropped on disconnect and recreated by init_session_state
+MSP_STATE_KEYS = ("prefetched", "enbox_offset", "enbox_search")
+USER_STATE_KEYS = ("pending_ops", "emails", "emails_view", "emails_loaded", "inbox_offset", "next_page",
+                   "sender_names", "email_details")
+
+class APIError(str):
+    """Error message from a failed API call, carrying the HTTP status when the server answered"""
+    
+    def __new__(cls, message, status=None):
+        error = super().__new__(cls, message)
+        error.status = status
+        return error
+
+def is_read_timeout(error):
+    """Whether a ConnectionError is urllib3 giving up on a read timeout once its retries ran out"""
+    return bool(error.args) and isinstance(getattr(error.args[0], "reason", None), ReadTimeoutError)
+
+@st.cache_resource(show_spinner=False)
+def get_http_adapter(read_only):
+    """Build the pooled adapter for read-only or mutating calls once per process and share it between sessions"""
+    if read_only:
+        # Retry transient server and gateway errors over the same pool instead of surfacing them;
+        # a stalled read is not retried, so a hung backend costs one read timeout rather than three
+        retry = Retry(
+            total=3,
+            connect=3,
+            read=0,
+            backoff_factor=0.4,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["POST"]),
+            respect_retry_after_header=True
+        )
+    else:
+        # A mutating call may already have run once the server saw it, so only connect failures are retried
+        retry = Retry(total=3, connect=3, read=0, status_forcelist=(), backoff_factor=0.4)
+    return HTTPAdapter(max_retries=retry, pool_connections=10, pool_maxsize=20)
+
+def create_session(headers, read_only):
+    """Create a keep-alive HTTP session on the shared adapter for the API host"""
+    session = requests.Session()
+    session.headers.update(headers)
+    # Advertise every content-encoding urllib3 can decode here (br/zstd when installed)
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    session.mount("https://", get_http_adapter(read_only))
+    return session
+
 class MSPAPIClient:
     """Client for MSP API operations"""
     
@@ -78,19 +130,47 @@ class MSPAPIClient:
             "Content-Type": "application/json",
             "X-MSP-API-Key": api_key
         }
+        self.session = create_session(self.headers, read_only=True)
+        self.write_session = create_session(self.headers, read_only=False)
+        self.batch_supported = True
     
     def _make_request(self, action, **kwargs):
         """Make a request to the MSP API with the given action"""
         try:
             payload = {"action": action, **kwargs}
-            response = requests.post(MSP_API_URL, headers=self.headers, json=payload)
+            response = self._session(action).post(MSP_API_URL, data=orjson.dumps(payload), timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            return response.json(), None
-        except requests.exceptions.RequestException as e:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("MSP API %s returned %d bytes, Content-Encoding %s",
+                             action, len(response.content), response.headers.get("Content-Encoding"))
+            return orjson.loads(response.content), None
+        except requests.exceptions.Timeout as e:
+            self._reset_pool(action, e)
+            return None, TIMEOUT_ERROR
+        except requests.exceptions.ConnectionError as e:
+            self._reset_pool(action, e)
+            return None, TIMEOUT_ERROR if is_read_timeout(e) else str(e)
+        except requests.exceptions.HTTPError as e:
+            return None, APIError(str(e), e.response.status_code)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             return None, str(e)
     
-    def get_enboxes(self):
-        return self._make_request("list-enboxes")
+    def _reset_pool(self, action, error):
+        """Drop pooled connections after a network failure so a broken socket is not reused"""
+        logger.warning("MSP API %s failed with %s; resetting connection pool", action, type(error).__name__)
+        self._session(action).get_adapter(MSP_API_URL).close()
+    
+    def _session(self, action):
+        return self.session if action in READ_ONLY_ACTIONS else self.write_session
+    
+    def get_enboxes(self, search=None, limit=None, offset=0):
+        # Only the columns the Enboxes table renders are requested
+        params = {"fields": ENBOX_FIELDS}
+        if limit:
+            params.update(limit=limit, offset=offset)
+        if search:
+            params["search"] = search
+        return self._make_request("list-enboxes", **params)
     
     def create_enbox(self, email, password=None, display_name=None, create_via="direct"):
         if create_via == "direct":
@@ -114,6 +194,35 @@ class MSPAPIClient:
     
     def get_usage(self):
         return self._make_request("get-usage")
+    
+    def batch(self, calls):
+        """Run several {"action": ..., **params} calls in one round trip, returning (data, error) per call"""
+        unsupported = False
+        if self.batch_supported:
+            data, error = self._make_request("batch", requests=calls)
+            results = data.get("results") if isinstance(data, dict) else None
+            if not error and isinstance(results, dict):
+                return [self._batch_result(results.get(call["action"])) for call in calls]
+            # A timeout or gateway error says nothing about batch support, so only a rejection counts
+            unsupported = getattr(error, "status", None) in UNKNOWN_ACTION_STATUSES if error else True
+        
+        # Older deployments have no batch action, so send the calls side by side instead
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            futures = [executor.submit(self._make_request, **call) for call in calls]
+            results = [future.result() for future in futures]
+        
+        if unsupported and not any(error for _, error in results):
+            # The single calls went through, so the server rejected the batch action itself
+            self.batch_supported = False
+        return results
+    
+    @staticmethod
+    def _batch_result(result):
+        if result is None:
+            return None, "Missing from batch response"
+        if isinstance(result, dict) and result.get("error"):
+            return None, str(result["error"])
+        return result, None
 
 class UserAPIClient:
     """Client for User API operations (Email management)"""
@@ -124,23 +233,55 @@ class UserAPIClient:
             "Content-Type": "application/json",
             "X-Enbox-API-Key": api_key
         }
+        self.session = create_session(self.headers, read_only=True)
+        self.write_session = create_session(self.headers, read_only=False)
+        self.bulk_supported = True
     
     def _make_request(self, action, **kwargs):
         """Make a request to the User API with the given action"""
         try:
             payload = {"action": action, **kwargs}
-            response = requests.post(USER_API_URL, headers=self.headers, json=payload)
+            response = self._session(action).post(USER_API_URL, data=orjson.dumps(payload), timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            return response.json(), None
-        except requests.exceptions.RequestException as e:
+            return orjson.loads(response.content), None
+        except requests.exceptions.Timeout as e:
+            self._reset_pool(action, e)
+            return None, TIMEOUT_ERROR
+        except requests.exceptions.ConnectionError as e:
+            self._reset_pool(action, e)
+            return None, TIMEOUT_ERROR if is_read_timeout(e) else str(e)
+        except requests.exceptions.HTTPError as e:
+            return None, APIError(str(e), e.response.status_code)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             return None, str(e)
     
+    def _reset_pool(self, action, error):
+        """Drop pooled connections after a network failure so a broken socket is not reused"""
+        logger.warning("User API %s failed with %s; resetting connection pool", action, type(error).__name__)
+        self._session(action).get_adapter(USER_API_URL).close()
+    
+    def _session(self, action):
+        return self.session if action in READ_ONLY_ACTIONS else self.write_session
+    
     def get_profile(self):
         return self._make_request("get-profile")
     
     def list_emails(self, folder="inbox", limit=50, offset=0):
         return self._make_request("list-emails", folder=folder, limit=limit, offset=offset)
     
+    def list_emails_stream(self, folder="inbox", limit=50, offset=0):
+        """Yield emails one at a time while the list-emails response is still arriving"""
+        payload = {"action": "list-emails", "folder": folder, "limit": limit, "offset": offset}
+        try:
+            with self.session.post(USER_API_URL, data=orjson.dumps(payload), stream=True, timeout=REQUEST_TIMEOUT) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                yield from ijson.items(response.raw, "emails.item", use_float=True)
+        # Reading response.raw raises urllib3's own errors, which requests does not wrap
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, ProtocolError, ReadTimeoutError) as e:
+            self._reset_pool("list-emails", e)
+            raise
+    
     def get_email(self, email_id):
         return self._make_request("get-email", emailId=email_id)
     
@@ -180,12 +321,247 @@ class UserAPIClient:
     def delete_draft(self, email_id):
         return self._make_request("delete-draft", emailId=email_id)
     
+    def bulk_action(self, ops):
+        """Apply (action, email_id) pairs in one request, falling back to one request per op"""
+        unsupported = False
+        if self.bulk_supported:
+            data, error = self._make_request(
+                "bulk",
+                ops=[{"action": action, "emailId": email_id} for action, email_id in ops]
+            )
+            if not error:
+                return data, None
+            # A timeout or gateway error says nothing about bulk support, so only a rejection counts
+            unsupported = getattr(error, "status", None) in UNKNOWN_ACTION_STATUSES
+        
+        errors = []
+        for action, email_id in ops:
+            _, op_error = self._make_request(action, emailId=email_id)
+            if op_error:
+                errors.append(f"{action} {email_id}: {op_error}")
+        
+        if not errors:
+            if unsupported:
+                # The single ops went through, so the server rejected the bulk action itself
+                self.bulk_supported = False
+            return {"results": len(ops)}, None
+        return None, "; ".join(errors)
+    
     def list_labels(self):
         return self._make_request("list-labels")
     
     def resolve_enbox(self, enbox_id):
         return self._make_request("resolve-enbox", enboxId=enbox_id)
 
+def create_async_client(headers):
+    """Create an HTTP/2 async client that multiplexes requests over one connection"""
+    return httpx.AsyncClient(
+        http2=True,
+        headers=headers,
+        # Fail fast on an unreachable host, like the sync clients' REQUEST_TIMEOUT connect limit
+        timeout=httpx.Timeout(10, connect=REQUEST_TIMEOUT[0]),
+        limits=httpx.Limits(max_keepalive_connections=8)
+    )
+
+class AsyncMSPAPIClient:
+    """Async client for issuing MSP API requests concurrently"""
+    
+    def __init__(self, api_key, max_concurrency=10):
+        self.api_key = api_key
+        self.headers = {
+            "Content-Type": "application/json",
+            "X-MSP-API-Key": api_key
+        }
+        self.client = create_async_client(self.headers)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def _post(self, action, **kwargs):
+        """Make a request to the MSP API, bounded by the client's semaphore"""
+        async with self.semaphore:
+            try:
+                payload = {"action": action, **kwargs}
+                response = await self.client.post(MSP_API_URL, content=orjson.dumps(payload))
+                response.raise_for_status()
+                return orjson.loads(response.content), None
+            except httpx.TimeoutException:
+                return None, TIMEOUT_ERROR
+            except httpx.HTTPStatusError as e:
+                return None, APIError(str(e), e.response.status_code)
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+                return None, str(e)
+    
+    async def get_enboxes(self, limit=None, offset=0):
+        params = {"limit": limit, "offset": offset} if limit else {}
+        return await self._post("list-enboxes", fields=ENBOX_FIELDS, **params)
+    
+    async def get_stats(self):
+        return await self._post("get-stats")
+    
+    async def get_usage(self):
+        return await self._post("get-usage")
+
+class AsyncUserAPIClient:
+    """Async client for fanning out independent User API requests concurrently"""
+    
+    def __init__(self, api_key, max_concurrency=10):
+        self.api_key = api_key
+        self.headers = {
+            "Content-Type": "application/json",
+            "X-Enbox-API-Key": api_key
+        }
+        self.client = create_async_client(self.headers)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def _post(self, action, **kwargs):
+        """Make a request to the User API, bounded by the client's semaphore"""
+        async with self.semaphore:
+            try:
+                payload = {"action": action, **kwargs}
+                response = await self.client.post(USER_API_URL, content=orjson.dumps(payload))
+                response.raise_for_status()
+                return orjson.loads(response.content), None
+            except httpx.TimeoutException:
+                return None, TIMEOUT_ERROR
+            except httpx.HTTPStatusError as e:
+                return None, APIError(str(e), e.response.status_code)
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+                return None, str(e)
+    
+    async def get_profile(self):
+        return await self._post("get-profile")
+    
+    async def list_emails(self, folder="inbox", limit=50, offset=0):
+        return await self._post("list-emails", folder=folder, limit=limit, offset=offset)
+    
+    async def get_emails_bulk(self, email_ids):
+        """Fetch several emails at once, returning (data, error) pairs in input order"""
+        return await asyncio.gather(*(self._post("get-email", emailId=email_id) for email_id in email_ids))
+    
+    async def resolve_enboxes_bulk(self, enbox_ids):
+        """Resolve several Enbox IDs at once, returning (data, error) pairs in input order"""
+        return await asyncio.gather(*(self._post("resolve-enbox", enboxId=enbox_id) for enbox_id in enbox_ids))
+
+@st.cache_resource(show_spinner=False)
+def get_event_loop():
+    """Start the background event loop that owns every async API client"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="api-event-loop", daemon=True).start()
+    return loop
+
+def run_async(coro):
+    """Run a coroutine on the shared event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+async def gather_requests(*coros):
+    """Await several API requests concurrently, returning results in order"""
+    return await asyncio.gather(*coros)
+
+@st.cache_resource(show_spinner=False)
+def get_async_msp_client(api_key):
+    """Share one async MSP client, bound to the shared event loop, across reruns"""
+    return AsyncMSPAPIClient(api_key)
+
+@st.cache_resource(show_spinner=False)
+def get_async_user_client(api_key):
+    """Share one async User client, bound to the shared event loop, across reruns"""
+    return AsyncUserAPIClient(api_key)
+
+class CachedAPIError(Exception):
+    """Raised inside cached fetchers so that failed responses are not memoized"""
+
+class BatchAPIError(CachedAPIError):
+    """Raised when part of a batch failed, carrying every call's (data, error) so the successes are kept"""
+    
+    def __init__(self, results):
+        super().__init__("; ".join(error for _, error in results if error))
+        self.results = results
+
+def _raise_on_error(result):
+    data, error = result
+    if error:
+        raise CachedAPIError(error)
+    return data
+
+def fetch_cached(fetcher, *args):
+    """Call a cached fetcher, returning (data, error) like the API clients do"""
+    try:
+        return fetcher(*args), None
+    except CachedAPIError as e:
+        return None, str(e)
+
+def fetch_cached_parallel(*calls):
+    """Run several (fetcher, *args) calls on worker threads, returning (data, error) pairs in order"""
+    if not calls:
+        return []
+    
+    # Workers need the script context to read and fill the Streamlit caches
+    with ThreadPoolExecutor(
+        max_workers=len(calls),
+        initializer=add_script_run_ctx,
+        initargs=(None, get_script_run_ctx())
+    ) as executor:
+        futures = [executor.submit(fetch_cached, fetcher, *args) for fetcher, *args in calls]
+        return [future.result() for future in futures]
+
+@st.cache_resource(show_spinner=False)
+def get_msp_client(api_key):
+    """Share one MSP client, and so one Session and connection pool, across reruns"""
+    return MSPAPIClient(api_key)
+
+@st.cache_resource(show_spinner=False)
+def get_user_client(api_key):
+    """Share one User client, and so one Session and connection pool, across reruns"""
+    return UserAPIClient(api_key)
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _cached_get_enboxes(api_key, search=None, limit=None, offset=0):
+    return _raise_on_error(get_msp_client(api_key).get_enboxes(search, limit, offset))
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _cached_get_stats(api_key):
+    return _raise_on_error(get_msp_client(api_key).get_stats())
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _cached_get_usage(api_key):
+    return _raise_on_error(get_msp_client(api_key).get_usage())
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _cached_batch(api_key, actions):
+    results = get_msp_client(api_key).batch([{"action": action} for action in actions])
+    # Only a batch where every call succeeded is cached
+    if any(error for _, error in results):
+        raise BatchAPIError(results)
+    return [data for data, _ in results]
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _cached_list_emails(api_key, folder, limit, offset):
+    stream = get_user_client(api_key).list_emails_stream(folder=folder, limit=limit, offset=offset)
+    try:
+        return {"emails": list(islice(stream, limit))}
+    except (requests.exceptions.Timeout, ReadTimeoutError):
+        raise CachedAPIError(TIMEOUT_ERROR)
+    except requests.exceptions.ConnectionError as e:
+        raise CachedAPIError(TIMEOUT_ERROR if is_read_timeout(e) else str(e))
+    except (requests.exceptions.RequestException, ProtocolError, DecodeError, ijson.JSONError) as e:
+        raise CachedAPIError(str(e))
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _cached_get_profile(api_key):
+    return _raise_on_error(get_user_client(api_key).get_profile())
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _cached_list_labels(api_key):
+    return _raise_on_error(get_user_client(api_key).list_labels())
+
+@st.cache_resource(show_spinner=False)
+def load_css():
+    """Read the stylesheet once per server process and wrap it for injection"""
+    return f"<style>{CSS_PATH.read_text()}</style>"
+
+def inject_css():
+    # st.html sends the style block without the Markdown parse that st.markdown runs on every rerun
+    st.html(load_css())
+
 def init_session_state():
     """Initialize session state variables"""
     if 'msp_authenticated' not in st.session_state:
@@ -196,115 +572,304 @@ def init_session_state():
         st.session_state.msp_api_key = None
     if 'user_api_key' not in st.session_state:
         st.session_state.user_api_key = None
-    if 'enboxes_data' not in st.session_state:
-        st.session_state.enboxes_data = None
+    if 'prefetched' not in st.session_state:
+        st.session_state.prefetched = {}
+    if 'pending_ops' not in st.session_state:
+        st.session_state.pending_ops = []
+    if 'emails' not in st.session_state:
+        st.session_state.emails = None
+    if 'emails_view' not in st.session_state:
+        st.session_state.emails_view = None
+    if 'emails_loaded' not in st.session_state:
+        st.session_state.emails_loaded = (0, 0.0)
+    if 'enbox_offset' not in st.session_state:
+        st.session_state.enbox_offset = 0
+    if 'inbox_offset' not in st.session_state:
+        st.session_state.inbox_offset = 0
+    if 'next_page' not in st.session_state:
+        st.session_state.next_page = None
+    if 'sender_names' not in st.session_state:
+        st.session_state.sender_names = {}
+    if 'email_details' not in st.session_state:
+        st.session_state.email_details = {}
     if 'current_mode' not in st.session_state:
         st.session_state.current_mode = "MSP"
 
-def authenticate_msp():
-    """Handle MSP API authentication"""
+def read_api_key(name, label):
+    """Read an API key from secrets, warning when secrets are not configured"""
     try:
-        api_key = st.secrets.get("msp_api_key")
-        if not api_key:
-            return False
-        
-        client = MSPAPIClient(api_key)
-        data, error = client.get_enboxes()
-        
-        if error:
-            st.sidebar.error(f"MSP Auth Error: {error[:50]}...")
-            return False
-        else:
-            st.session_state.msp_api_key = api_key
-            return True
+        return st.secrets.get(name)
     except Exception as e:
-        st.sidebar.warning(f"MSP API key not configured")
-        return False
+        st.sidebar.warning(f"{label} API key not configured")
+        return None
 
-def authenticate_user():
-    """Handle User API authentication"""
-    try:
-        api_key = st.secrets.get("user_api_key")
-        if not api_key:
-            return False
-        
-        client = UserAPIClient(api_key)
-        data, error = client.get_profile()
-        
-        if error:
-            st.sidebar.error(f"User Auth Error: {error[:50]}...")
-            return False
-        else:
-            st.session_state.user_api_key = api_key
-            return True
-    except Exception as e:
-        st.sidebar.warning(f"User API key not configured")
-        return False
+def remember(cache, key, value):
+    """Store a value in a per-session dict, evicting the oldest entries past SESSION_CACHE_LIMIT"""
+    cache.pop(key, None)
+    cache[key] = value
+    while len(cache) > SESSION_CACHE_LIMIT:
+        del cache[next(iter(cache))]
+
+def reset_state(keys):
+    for key in keys:
+        st.session_state.pop(key, None)
+
+def store_prefetched(action, data):
+    """Keep a prefetched response so the page that needs it can skip the request"""
+    st.session_state.prefetched[action] = (time.monotonic(), data)
+
+def take_prefetched(action):
+    """Return prefetched data for an action while it is fresher than the cache TTL"""
+    entry = st.session_state.prefetched.pop(action, None)
+    if entry and time.monotonic() - entry[0] < CACHE_TTL:
+        return entry[1]
+    return None
+
+async def prefetch_msp(client):
+    """Fetch the Enbox list, stats and usage together so every MSP page opens warm"""
+    # The Enbox list is fetched as the Dashboard's first page, so the prefetch can stand in for it
+    return await asyncio.gather(client.get_enboxes(ENBOX_PAGE_SIZE), client.get_stats(), client.get_usage())
+
+@st.cache_resource(show_spinner=False)
+def get_probe_results():
+    """Map API keys to (checked_at, error) from their last auth probe, shared by all sessions"""
+    return {}
+
+def is_key_rejection(error):
+    """Whether a probe error means the server refused the key, rather than that it could not be reached"""
+    status = getattr(error, "status", None)
+    return status is not None and 400 <= status < 500 and status not in (408, 429)
+
+def record_probe(api_key, error):
+    # Timeouts and outages are left out so that one network blip does not lock the key out of every session
+    if not error or is_key_rejection(error):
+        get_probe_results()[api_key] = (time.monotonic(), error)
+
+def recent_probe_error(api_key):
+    """Return (True, error) if a key's last probe can still be trusted, else (False, None)"""
+    probe = get_probe_results().get(api_key)
+    if probe is None:
+        return False, None
+    
+    checked_at, error = probe
+    ttl = KEY_FAILURE_TTL if error else KEY_VERIFY_TTL
+    if time.monotonic() - checked_at >= ttl:
+        return False, None
+    return True, error
+
+def finish_auth(mode, api_key, error):
+    """Record a successful authentication of one API key in the session"""
+    if not error:
+        st.session_state[f"{mode}_api_key"] = api_key
+        st.session_state[f"{mode}_authenticated"] = True
+
+def configured_key(mode, label):
+    """Return the session's authenticated key for an API, else the one in secrets"""
+    if st.session_state[f"{mode}_authenticated"]:
+        return st.session_state[f"{mode}_api_key"]
+    return read_api_key(f"{mode}_api_key", label)
+
+def authenticate_apis(msp_key=None, user_key=None):
+    """Authenticate the given API keys, probing them concurrently, and return {mode: error} for failures"""
+    errors = {}
+    if st.session_state.msp_authenticated:
+        msp_key = None
+    if st.session_state.user_authenticated:
+        user_key = None
+    
+    # Keys probed recently reuse that outcome instead of probing again
+    if msp_key:
+        known, error = recent_probe_error(msp_key)
+        if known:
+            finish_auth("msp", msp_key, error)
+            errors["msp"] = error
+            msp_key = None
+    if user_key:
+        known, error = recent_probe_error(user_key)
+        if known:
+            finish_auth("user", user_key, error)
+            errors["user"] = error
+            user_key = None
+    
+    pending = []
+    if msp_key:
+        pending.append(prefetch_msp(get_async_msp_client(msp_key)))
+    if user_key:
+        pending.append(get_async_user_client(user_key).get_profile())
+    
+    if not pending:
+        return errors
+    
+    results = run_async(gather_requests(*pending))
+    
+    if msp_key:
+        (enboxes_data, error), *summaries = results.pop(0)
+        record_probe(msp_key, error)
+        finish_auth("msp", msp_key, error)
+        errors["msp"] = error
+        if not error:
+            store_prefetched("list-enboxes", enboxes_data)
+            for action, (data, summary_error) in zip(("get-stats", "get-usage"), summaries):
+                if not summary_error:
+                    store_prefetched(action, data)
+    
+    if user_key:
+        _, error = results.pop(0)
+        record_probe(user_key, error)
+        finish_auth("user", user_key, error)
+        errors["user"] = error
+    
+    return errors
+
+def format_dates(values):
+    """Format ISO timestamps as YYYY-MM-DD, showing N/A for missing or malformed values"""
+    import pandas as pd
+    
+    days = values.astype("string[pyarrow]").str.slice(0, 10)
+    return pd.to_datetime(days, format="%Y-%m-%d", errors="coerce").dt.strftime("%Y-%m-%d").fillna("N/A")
+
+def show_json(data):
+    """Render a debug JSON panel, serializing with orjson instead of st.json's stdlib json.dumps"""
+    st.json(orjson.dumps(data).decode())
 
 # MSP Functions (from previous code)
+@st.fragment
 def display_enboxes_list(client):
     """Display list of all Enboxes"""
-    st.markdown('<div class="section-header">📦 Enboxes</div>', unsafe_allow_html=True)
+    # pandas and numpy are imported on first use so pages without tables never load them
+    import numpy as np
+    import pandas as pd
+    
+    st.subheader("📦 Enboxes", divider="blue")
     
     col1, col2, col3 = st.columns([2, 2, 1])
     with col3:
-        if st.button("🔄 Refresh", use_container_width=True):
-            st.session_state.enboxes_data = None
-    
-    if st.session_state.enboxes_data is None:
+        refresh = st.button("🔄 Refresh", use_container_width=True)
+        if refresh:
+            _cached_get_enboxes.clear()
+    
+    # The term only changes on Enter or blur, and the callback sends the listing back to page one
+    search_term = st.text_input("🔍 Search Enboxes", placeholder="Search by ID, name, or rsync ID...",
+                                key="enbox_search", on_change=set_enbox_offset, args=(0,))
+    search = search_term.strip()
+    offset = st.session_state.enbox_offset
+    
+    # The auth probe prefetches the unfiltered listing, which only stands in for the first page
+    data = None if refresh or search or offset else take_prefetched("list-enboxes")
+    if data is None:
         with st.spinner("Loading Enboxes..."):
-            data, error = client.get_enboxes()
-            if error:
-                st.error(f"❌ Error loading Enboxes: {error}")
-                return
-            st.session_state.enboxes_data = data
+            data, error = fetch_cached(_cached_get_enboxes, client.api_key, search or None, ENBOX_PAGE_SIZE, offset)
+        
+        if error:
+            st.error(f"❌ Error loading Enboxes: {error}")
+            return
     
-    data = st.session_state.enboxes_data
+    enboxes, count, has_more = enbox_page(data)
     
-    if isinstance(data, dict):
-        enboxes = data.get('enboxes', data.get('managedEnboxes', data.get('data', [])))
-        count = data.get('count', len(enboxes))
-    else:
-        enboxes = data if isinstance(data, list) else []
-        count = len(enboxes)
-    
-    if not enboxes or len(enboxes) == 0:
+    if not enboxes and not search and not offset:
         st.info("No Enboxes found. Create your first one below!")
         return
     
-    col1, col2, col3 = st.columns(3)
-    with col1:
+    records = pd.DataFrame.from_records(enboxes, columns=ENBOX_FIELDS)
+    text = records[["id", "enbox_rsync_id", "display_name", "created_via"]].fillna("N/A").astype("string[pyarrow]")
+    
+    # Servers that ignore search or paging send back the full listing, so filter and page it here
+    ignored_paging = len(enboxes) > ENBOX_PAGE_SIZE
+    if offset and enboxes and not ignored_paging and count is None and has_more is None:
+        # Without paging metadata, a page that starts like the first one means the offset was ignored
+        first_page, _ = fetch_cached(_cached_get_enboxes, client.api_key, search or None, ENBOX_PAGE_SIZE, 0)
+        first_rows = enbox_page(first_page)[0]
+        ignored_paging = bool(first_rows) and first_rows[0].get('id') == enboxes[0].get('id')
+    
+    ignored_search = False
+    if search:
+        # The server also matches fields this table does not show, such as the email, so its results are
+        # only filtered here when it answered with exactly the unfiltered listing
+        plain, _ = fetch_cached(_cached_get_enboxes, client.api_key, None, ENBOX_PAGE_SIZE, offset)
+        plain_rows = enbox_page(plain)[0]
+        ignored_search = bool(plain_rows) and [row.get('id') for row in plain_rows] == [row.get('id') for row in enboxes]
+    
+    if ignored_search:
+        # Fields are joined with a unit separator so a search term never matches across two of them
+        search_index = (text["id"] + "\x1f" + text["display_name"] + "\x1f" + text["enbox_rsync_id"]).str.lower()
+        matches = search_index.str.contains(search.lower(), regex=False).to_numpy()
+        records, text = records[matches], text[matches]
+        # The server's count is for the unfiltered listing
+        count = None
+    
+    if ignored_paging:
+        count = len(records)
+        has_next = offset + ENBOX_PAGE_SIZE < count
+        page = slice(offset, offset + ENBOX_PAGE_SIZE)
+    else:
+        if has_more is not None:
+            has_next = bool(has_more)
+        elif count is not None:
+            has_next = offset + len(enboxes) < count
+        else:
+            # Without paging metadata only a short page is known to be the last one
+            has_next = len(enboxes) == ENBOX_PAGE_SIZE
+        if not offset and not has_next:
+            count = len(records)
+        page = slice(None)
+    
+    active = records["is_active"].fillna(True).astype(bool).to_numpy()
+    
+    # Active and Inactive are only known when every Enbox came back, not for one server page
+    if ignored_paging or (not offset and not has_next):
+        active_count = int(np.count_nonzero(active))
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Enboxes", count)
+        with col2:
+            st.metric("Active", active_count)
+        with col3:
+            inactive_count = count - active_count
+            st.metric("Inactive", inactive_count)
+    elif count is not None:
         st.metric("Total Enboxes", count)
-    with col2:
-        active_count = sum(1 for e in enboxes if e.get("is_active", True))
-        st.metric("Active", active_count)
-    with col3:
-        inactive_count = count - active_count
-        st.metric("Inactive", inactive_count)
     
-    df_data = []
-    for enbox in enboxes:
-        df_data.append({
-            "ID": enbox.get("id", "N/A")[:8] + "...",
-            "Rsync ID": enbox.get("enbox_rsync_id", "N/A"),
-            "Display Name": enbox.get("display_name", "N/A"),
-            "Created Via": enbox.get("created_via", "N/A"),
-            "Status": "🟢 Active" if enbox.get("is_active", True) else "🔴 Inactive",
-            "Created": enbox.get("created_at", "N/A")[:10] if enbox.get("created_at") else "N/A"
-        })
+    records, text, active = records.iloc[page], text.iloc[page], active[page]
     
-    df = pd.DataFrame(df_data)
-    search_term = st.text_input("🔍 Search Enboxes", placeholder="Search by ID, name, or rsync ID...")
+    df = pd.DataFrame({
+        "ID": text["id"].str.slice(0, 8) + "...",
+        "Rsync ID": text["enbox_rsync_id"],
+        "Display Name": text["display_name"],
+        "Created Via": text["created_via"],
+        "Status": np.where(active, "🟢 Active", "🔴 Inactive"),
+        "Created": format_dates(records["created_at"])
+    })
     
-    if search_term:
-        mask = df.astype(str).apply(lambda x: x.str.contains(search_term, case=False, na=False)).any(axis=1)
-        df = df[mask]
+    if df.empty:
+        st.info("No Enboxes match your search" if search else "No more Enboxes")
+    else:
+        st.dataframe(df, use_container_width=True, hide_index=True)
     
-    st.dataframe(df, use_container_width=True, hide_index=True)
+    if offset or has_next:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("◀ Previous", disabled=offset == 0, on_click=set_enbox_offset,
+                      args=(max(offset - ENBOX_PAGE_SIZE, 0),), use_container_width=True)
+        with col2:
+            st.caption(f"Page {offset // ENBOX_PAGE_SIZE + 1}")
+        with col3:
+            st.button("Next ▶", disabled=not has_next, on_click=set_enbox_offset,
+                      args=(offset + ENBOX_PAGE_SIZE,), use_container_width=True)
 
+def enbox_page(data):
+    """Split a list-enboxes response into (enboxes, count, has_more), leaving unknown metadata as None"""
+    if isinstance(data, dict):
+        enboxes = data.get('enboxes', data.get('managedEnboxes', data.get('data', [])))
+        return enboxes, data.get('count'), data.get('has_more')
+    return (data if isinstance(data, list) else []), None, None
+
+def set_enbox_offset(offset):
+    st.session_state.enbox_offset = offset
+
+@st.fragment
 def create_enbox_form(client):
     """Form to create a new Enbox"""
-    st.markdown('<div class="section-header">➕ Create New Enbox</div>', unsafe_allow_html=True)
+    st.subheader("➕ Create New Enbox", divider="blue")
     
     create_method = st.radio(
         "Creation Method",
@@ -356,119 +921,267 @@ def create_enbox_form(client):
                             st.caption(f"Token: {result.get('invite_token', 'N/A')}")
                             st.caption(f"Expires: {result.get('invite_expires_at', 'N/A')[:10]}")
                         
-                        st.session_state.enboxes_data = None
+                        _cached_get_enboxes.clear()
+                        _cached_get_stats.clear()
+                        st.session_state.prefetched.pop("list-enboxes", None)
+                        st.session_state.prefetched.pop("get-stats", None)
                         st.balloons()
 
 # Email Management Functions
 def display_inbox(client):
     """Display inbox with email list"""
-    st.markdown('<div class="section-header">📬 Inbox</div>', unsafe_allow_html=True)
+    import numpy as np
+    import pandas as pd
+    
+    st.subheader("📬 Inbox", divider="blue")
     
-    folder = st.selectbox("Folder", ["inbox", "sent", "drafts", "trash"])
+    folder = st.selectbox("Folder", ["inbox", "sent", "drafts", "trash"], on_change=set_inbox_offset, args=(0,))
+    offset = st.session_state.inbox_offset
     
     col1, col2 = st.columns([3, 1])
     with col2:
         if st.button("🔄 Refresh Emails", use_container_width=True):
-            pass
+            _cached_list_emails.clear()
+            st.session_state.emails = None
+            st.session_state.next_page = None
+            st.session_state.email_details = {}
+    
+    flush_pending_ops(client)
+    
+    view = (folder, offset)
+    fetched_count, loaded_at = st.session_state.emails_loaded
+    # The listed page carries optimistic edits, so it is reloaded once it is older than the cache TTL
+    stale = time.monotonic() - loaded_at >= CACHE_TTL
+    if st.session_state.emails is None or st.session_state.emails_view != view or stale:
+        with st.spinner("Loading emails..."):
+            data, error = take_next_page(view) or fetch_cached(
+                _cached_list_emails, client.api_key, folder, INBOX_PAGE_SIZE, offset
+            )
+        
+        if error:
+            st.error(f"❌ Error loading emails: {error}")
+            return
+        
+        st.session_state.emails = data.get('emails', []) if isinstance(data, dict) else []
+        st.session_state.emails_view = view
+        fetched_count = len(st.session_state.emails)
+        st.session_state.emails_loaded = (fetched_count, time.monotonic())
     
-    with st.spinner("Loading emails..."):
-        data, error = client.list_emails(folder=folder, limit=50, offset=0)
+    emails = st.session_state.emails
+    # Archive and trash shrink the listed page, so paging goes by what the server sent
+    has_next = fetched_count >= INBOX_PAGE_SIZE
     
-    if error:
-        st.error(f"❌ Error loading emails: {error}")
-        return
+    if has_next:
+        prefetch_next_page(client, folder, offset + INBOX_PAGE_SIZE)
     
-    emails = data.get('emails', []) if isinstance(data, dict) else []
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button("◀ Previous", disabled=offset == 0, on_click=set_inbox_offset,
+                  args=(max(offset - INBOX_PAGE_SIZE, 0),), use_container_width=True)
+    with col2:
+        st.caption(f"Page {offset // INBOX_PAGE_SIZE + 1}")
+    with col3:
+        st.button("Next ▶", disabled=not has_next, on_click=set_inbox_offset,
+                  args=(offset + INBOX_PAGE_SIZE,), use_container_width=True)
     
     if not emails:
         st.info(f"No emails in {folder}")
         return
     
+    prefetch_emails(client, emails[:PREFETCH_EMAIL_COUNT])
+    
     st.metric("Total Emails", len(emails))
     
-    for email in emails:
-        with st.expander(f"{'⭐' if email.get('is_starred') else '📧'} {email.get('subject', 'No Subject')} - {email.get('from_name', 'Unknown')}"):
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.caption(f"From: {email.get('from_name', 'N/A')}")
-                st.caption(f"Date: {email.get('created_at', 'N/A')[:10]}")
-            
-            with col2:
-                if st.button("👁️ View Full", key=f"view_{email.get('id')}"):
-                    view_email_detail(client, email.get('id'))
-            
-            with col3:
-                email_actions(client, email)
+    sender_names = resolve_sender_names(client, emails)
+    records = pd.DataFrame.from_records(emails, columns=EMAIL_FIELDS)
+    starred = records["is_starred"].fillna(False).astype(bool).to_numpy()
+    read = records["is_read"].fillna(False).astype(bool).to_numpy()
+    
+    df = pd.DataFrame({
+        " ": np.where(starred, "⭐", "📧"),
+        "Subject": records["subject"].fillna("No Subject"),
+        "From": records["from_name"].fillna(records["from_enbox_id"].map(sender_names)).fillna("Unknown"),
+        "Date": format_dates(records["created_at"]),
+        "Read": read
+    })
+    
+    event = st.dataframe(
+        df,
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="multi-row"
+    )
+    rows = [i for i in event.selection.rows if i < len(emails)]
+    
+    if not rows:
+        st.caption("Select emails to act on them")
+        return
+    
+    email_ids = records["id"].iloc[rows].tolist()
+    email_actions(client, email_ids, all_read=bool(read[rows].all()), all_starred=bool(starred[rows].all()))
+    
+    if len(email_ids) == 1:
+        st.markdown("---")
+        view_email_detail(client, email_ids[0])
+
+def set_inbox_offset(offset):
+    st.session_state.inbox_offset = offset
+
+def prefetch_next_page(client, folder, offset):
+    """Start loading the following inbox page in the background while this one is read"""
+    next_page = st.session_state.next_page
+    if next_page and next_page[0] == (folder, offset):
+        return
+    
+    request = get_async_user_client(client.api_key).list_emails(folder=folder, limit=INBOX_PAGE_SIZE, offset=offset)
+    future = asyncio.run_coroutine_threadsafe(request, get_event_loop())
+    st.session_state.next_page = ((folder, offset), time.monotonic(), future)
+
+def take_next_page(view):
+    """Return the prefetched page for a view if it loaded cleanly and is still fresh"""
+    next_page = st.session_state.next_page
+    if not next_page or next_page[0] != view:
+        return None
+    
+    st.session_state.next_page = None
+    _, started_at, future = next_page
+    if time.monotonic() - started_at >= CACHE_TTL:
+        future.cancel()
+        return None
+    
+    data, error = future.result()
+    return None if error else (data, None)
+
+def resolve_sender_names(client, emails):
+    """Resolve names for senders listed without one, in a single concurrent burst"""
+    names = st.session_state.sender_names
+    enbox_ids = list({
+        e['from_enbox_id'] for e in emails
+        if not e.get('from_name') and e.get('from_enbox_id') and e['from_enbox_id'] not in names
+    })
+    if not enbox_ids:
+        return names
+    
+    results = run_async(get_async_user_client(client.api_key).resolve_enboxes_bulk(enbox_ids))
+    for enbox_id, (data, error) in zip(enbox_ids, results):
+        user = data.get('user', data) if isinstance(data, dict) else {}
+        # Failed lookups are remembered too so they are not retried on every rerun
+        remember(names, enbox_id, None if error else user.get('display_name'))
+    return names
+
+def prefetch_emails(client, emails):
+    """Fetch full bodies for the given emails concurrently so opening them is instant"""
+    email_ids = [e['id'] for e in emails if e.get('id') and e['id'] not in st.session_state.email_details]
+    if not email_ids:
+        return
+    
+    results = run_async(get_async_user_client(client.api_key).get_emails_bulk(email_ids))
+    for email_id, (data, error) in zip(email_ids, results):
+        if not error:
+            remember(st.session_state.email_details, email_id, data)
 
 def view_email_detail(client, email_id):
     """View full email details"""
-    with st.spinner("Loading email..."):
-        data, error = client.get_email(email_id)
+    data = st.session_state.email_details.get(email_id)
     
-    if error:
-        st.error(f"❌ Error: {error}")
-        return
+    if data is None:
+        with st.spinner("Loading email..."):
+            data, error = client.get_email(email_id)
+        
+        if error:
+            st.error(f"❌ Error: {error}")
+            return
+        
+        remember(st.session_state.email_details, email_id, data)
     
     email = data.get('email', data) if isinstance(data, dict) else data
     
+    body_html = email.get('bodyHtml')
+    body_text = email.get('bodyText')
+    attachments = email.get('attachments')
+    
     st.markdown(f"### 📧 {email.get('subject', 'No Subject')}")
     st.markdown(f"**From:** {email.get('from_name', 'Unknown')} ({email.get('from_enbox_id', 'N/A')})")
     st.markdown(f"**Date:** {email.get('created_at', 'N/A')}")
     
-    if email.get('bodyHtml'):
+    if body_html:
         st.markdown("**Body (HTML):**")
-        st.markdown(email.get('bodyHtml'), unsafe_allow_html=True)
-    elif email.get('bodyText'):
+        st.markdown(body_html, unsafe_allow_html=True)
+    elif body_text:
         st.markdown("**Body:**")
-        st.text(email.get('bodyText'))
+        st.text(body_text)
     
-    if email.get('attachments'):
+    if attachments:
         st.markdown("**Attachments:**")
-        for att in email.get('attachments', []):
+        for att in attachments:
             st.caption(f"📎 {att.get('filename', 'Unknown')}")
 
-def email_actions(client, email):
-    """Display email action buttons"""
-    email_id = email.get('id')
+# Optimistic changes applied to a listed email for each queued action
+EMAIL_ACTION_UPDATES = {
+    "mark-read": ("is_read", True),
+    "mark-unread": ("is_read", False),
+    "star": ("is_starred", True),
+    "unstar": ("is_starred", False)
+}
+
+def queue_email_action(action, email_ids):
+    """Queue an action on some emails for the next flush and apply it to the listed emails now"""
+    st.session_state.pending_ops.extend((action, email_id) for email_id in email_ids)
+    
+    emails = st.session_state.emails or []
+    if action in EMAIL_ACTION_UPDATES:
+        field, value = EMAIL_ACTION_UPDATES[action]
+        for email in emails:
+            if email.get('id') in email_ids:
+                email[field] = value
+    else:
+        # Archived and trashed emails leave the current folder
+        st.session_state.emails = [e for e in emails if e.get('id') not in email_ids]
+
+def flush_pending_ops(client):
+    """Send all queued email actions to the API in a single batch"""
+    if not st.session_state.pending_ops:
+        return
     
+    ops = st.session_state.pending_ops
+    st.session_state.pending_ops = []
+    
+    with st.spinner("Applying changes..."):
+        _, error = client.bulk_action(ops)
+    _cached_list_emails.clear()
+    st.session_state.next_page = None
+    
+    if error:
+        # Drop the optimistic state so the list is reloaded from the server
+        st.session_state.emails = None
+        st.error(f"❌ Error applying changes: {error}")
+
+def email_actions(client, email_ids, all_read, all_starred):
+    """Display action buttons for the selected emails"""
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        if email.get('is_read'):
-            if st.button("Mark Unread", key=f"unread_{email_id}"):
-                client.mark_unread(email_id)
-                st.rerun()
+        if all_read:
+            st.button("Mark Unread", on_click=queue_email_action, args=("mark-unread", email_ids))
         else:
-            if st.button("Mark Read", key=f"read_{email_id}"):
-                client.mark_read(email_id)
-                st.rerun()
+            st.button("Mark Read", on_click=queue_email_action, args=("mark-read", email_ids))
     
     with col2:
-        if email.get('is_starred'):
-            if st.button("Unstar", key=f"unstar_{email_id}"):
-                client.unstar(email_id)
-                st.rerun()
+        if all_starred:
+            st.button("Unstar", on_click=queue_email_action, args=("unstar", email_ids))
         else:
-            if st.button("Star", key=f"star_{email_id}"):
-                client.star(email_id)
-                st.rerun()
+            st.button("Star", on_click=queue_email_action, args=("star", email_ids))
     
     with col3:
-        if st.button("Archive", key=f"archive_{email_id}"):
-            client.archive(email_id)
-            st.success("Archived!")
-            st.rerun()
+        st.button("Archive", on_click=queue_email_action, args=("archive", email_ids))
     
     with col4:
-        if st.button("Trash", key=f"trash_{email_id}"):
-            client.trash(email_id)
-            st.success("Moved to trash!")
-            st.rerun()
+        st.button("Trash", on_click=queue_email_action, args=("trash", email_ids))
 
 def send_email_form(client):
     """Form to send a new email"""
-    st.markdown('<div class="section-header">✉️ Send Email</div>', unsafe_allow_html=True)
+    st.subheader("✉️ Send Email", divider="blue")
     
     with st.form("send_email_form"):
         to = st.text_input("To (Enbox IDs, comma-separated)", placeholder="enbox_id1, enbox_id2")
@@ -510,15 +1223,17 @@ def send_email_form(client):
                 if error:
                     st.error(f"❌ Error: {error}")
                 else:
+                    _cached_list_emails.clear()
+                    st.session_state.emails = None
                     st.success("✅ Email sent successfully!")
                     st.balloons()
 
 def user_profile_page(client):
     """Display user profile"""
-    st.markdown('<div class="section-header">👤 Profile</div>', unsafe_allow_html=True)
+    st.subheader("👤 Profile", divider="blue")
     
     with st.spinner("Loading profile..."):
-        data, error = client.get_profile()
+        data, error = fetch_cached(_cached_get_profile, client.api_key)
     
     if error:
         st.error(f"❌ Error: {error}")
@@ -537,20 +1252,48 @@ def user_profile_page(client):
         st.metric("Account Type", profile.get('account_type', 'N/A'))
     
     with st.expander("📋 Full Profile JSON"):
-        st.json(profile)
+        show_json(profile)
 
+@st.fragment
 def display_msp_statistics(client):
     """Display MSP statistics"""
-    st.markdown('<div class="section-header">📊 MSP Statistics</div>', unsafe_allow_html=True)
+    import pandas as pd
+    
+    st.subheader("📊 MSP Statistics", divider="blue")
     
     col1, col2 = st.columns([3, 1])
     with col2:
-        if st.button("🔄 Refresh", use_container_width=True):
-            pass
+        refresh = st.button("🔄 Refresh", use_container_width=True)
+        if refresh:
+            _cached_get_stats.clear()
+            _cached_get_usage.clear()
+            _cached_batch.clear()
+    
+    stats_data = None if refresh else take_prefetched("get-stats")
+    usage_data = None if refresh else take_prefetched("get-usage")
+    
+    pending = {}
+    if stats_data is None:
+        pending["stats"] = (_cached_get_stats, client.api_key)
+    if usage_data is None:
+        pending["usage"] = (_cached_get_usage, client.api_key)
     
     with st.spinner("Loading statistics..."):
-        stats_data, stats_error = client.get_stats()
-        usage_data, usage_error = client.get_usage()
+        if len(pending) > 1:
+            # Both are missing, so fetch them in one batch round trip
+            try:
+                data = _cached_batch(client.api_key, ("get-stats", "get-usage"))
+                results = {"stats": (data[0], None), "usage": (data[1], None)}
+            except BatchAPIError as e:
+                # Keep whichever call succeeded and refetch only the failed ones on their own fetchers
+                results = {key: result for key, result in zip(pending, e.results) if not result[1]}
+                failed = [key for key in pending if key not in results]
+                results.update(zip(failed, fetch_cached_parallel(*(pending[key] for key in failed))))
+        else:
+            results = dict(zip(pending, fetch_cached_parallel(*pending.values())))
+    
+    stats_data, stats_error = results.get("stats", (stats_data, None))
+    usage_data, usage_error = results.get("usage", (usage_data, None))
     
     if stats_error:
         st.error(f"❌ Error loading stats: {stats_error}")
@@ -568,7 +1311,7 @@ def display_msp_statistics(client):
             st.metric("API Calls (24h)", stats.get('api_calls_24h', 0))
         
         with st.expander("📋 Full Stats Data"):
-            st.json(stats_data)
+            show_json(stats_data)
     
     if usage_error:
         st.error(f"❌ Error loading usage: {usage_error}")
@@ -604,10 +1347,10 @@ def display_msp_statistics(client):
 
 def display_labels(client):
     """Display user labels"""
-    st.markdown('<div class="section-header">🏷️ Labels</div>', unsafe_allow_html=True)
+    st.subheader("🏷️ Labels", divider="blue")
     
     with st.spinner("Loading labels..."):
-        data, error = client.list_labels()
+        data, error = fetch_cached(_cached_list_labels, client.api_key)
     
     if error:
         st.error(f"❌ Error loading labels: {error}")
@@ -629,7 +1372,7 @@ def display_labels(client):
 
 def resolve_enbox_tool(client):
     """Tool to resolve Enbox IDs"""
-    st.markdown('<div class="section-header">🔍 Resolve Enbox ID</div>', unsafe_allow_html=True)
+    st.subheader("🔍 Resolve Enbox ID", divider="blue")
     
     enbox_id = st.text_input("Enter Enbox ID to lookup")
     
@@ -645,79 +1388,67 @@ def resolve_enbox_tool(client):
             else:
                 user = data.get('user', data) if isinstance(data, dict) else data
                 st.success(f"✅ Found: {user.get('display_name', 'Unknown')}")
-                st.json(user)
+                show_json(user)
+
+def auth_status(mode, label, api_key, error=None):
+    """Show one API's connection state, with a disconnect button once it is connected"""
+    if st.session_state[f"{mode}_authenticated"]:
+        st.success(f"✅ {label} API Connected")
+        if st.button(f"🔓 Disconnect {label}", key=f"disconnect_{mode}"):
+            st.session_state[f"{mode}_authenticated"] = False
+            st.session_state[f"{mode}_api_key"] = None
+            reset_state(MSP_STATE_KEYS if mode == "msp" else USER_STATE_KEYS)
+            st.rerun()
+        return
+    
+    if not error and api_key:
+        _, error = recent_probe_error(api_key)
+    if error:
+        st.error(f"{label} Auth Error: {error[:50]}...")
+    elif api_key:
+        st.info(f"⏳ {label} API connects when one of its pages is opened")
+    else:
+        st.warning(f"❌ {label} API Not Connected")
+
+MSP_PAGES = {
+    "📦 MSP: Dashboard": display_enboxes_list,
+    "➕ MSP: Create Enbox": create_enbox_form,
+    "📊 MSP: Statistics": display_msp_statistics
+}
+
+USER_PAGES = {
+    "📬 User: Inbox": display_inbox,
+    "✉️ User: Send Email": send_email_form,
+    "👤 User: Profile": user_profile_page,
+    "🔍 User: Resolve Enbox": resolve_enbox_tool,
+    "🏷️ User: Labels": display_labels
+}
 
 def main():
     """Main application"""
     init_session_state()
+    inject_css()
     
     st.markdown('<div class="main-header">📧 Enbox Management Portal</div>', unsafe_allow_html=True)
     
-    # Authenticate both APIs
-    msp_client = None
-    user_client = None
-    
-    # Try to authenticate MSP
-    if not st.session_state.msp_authenticated:
-        if authenticate_msp():
-            st.session_state.msp_authenticated = True
-    
-    if st.session_state.msp_authenticated:
-        msp_client = MSPAPIClient(st.session_state.msp_api_key)
-    
-    # Try to authenticate User
-    if not st.session_state.user_authenticated:
-        if authenticate_user():
-            st.session_state.user_authenticated = True
-    
-    if st.session_state.user_authenticated:
-        user_client = UserAPIClient(st.session_state.user_api_key)
+    msp_key = configured_key("msp", "MSP")
+    user_key = configured_key("user", "User")
     
     # Sidebar with all available pages
     with st.sidebar:
         st.markdown("### 🔐 Authentication Status")
-        
-        if st.session_state.msp_authenticated:
-            st.success("✅ MSP API Connected")
-            if st.button("🔓 Disconnect MSP", key="disconnect_msp"):
-                st.session_state.msp_authenticated = False
-                st.session_state.msp_api_key = None
-                st.rerun()
-        else:
-            st.warning("❌ MSP API Not Connected")
-        
-        if st.session_state.user_authenticated:
-            st.success("✅ User API Connected")
-            if st.button("🔓 Disconnect User", key="disconnect_user"):
-                st.session_state.user_authenticated = False
-                st.session_state.user_api_key = None
-                st.rerun()
-        else:
-            st.warning("❌ User API Not Connected")
+        # Filled in once the selected page's API has been authenticated
+        status = st.container()
         
         st.markdown("---")
         st.markdown("### 📚 Navigation")
         
-        # Build page list based on available APIs
+        # Build page list based on configured APIs; only the selected page's API is authenticated
         pages = []
-        
-        # MSP Pages
-        if msp_client:
-            pages.extend([
-                "📦 MSP: Dashboard",
-                "➕ MSP: Create Enbox",
-                "📊 MSP: Statistics"
-            ])
-        
-        # User Pages
-        if user_client:
-            pages.extend([
-                "📬 User: Inbox",
-                "✉️ User: Send Email",
-                "👤 User: Profile",
-                "🔍 User: Resolve Enbox",
-                "🏷️ User: Labels"
-            ])
+        if msp_key:
+            pages.extend(MSP_PAGES)
+        if user_key:
+            pages.extend(USER_PAGES)
         
         if not pages:
             st.error("⚠️ No APIs connected")
@@ -745,23 +1476,27 @@ def main():
         st.caption("Enbox Portal v2.0")
         st.caption("MSP & User API Integration")
     
+    if page in MSP_PAGES:
+        st.session_state.current_mode = "MSP"
+        auth_errors = authenticate_apis(msp_key=msp_key)
+    else:
+        st.session_state.current_mode = "User"
+        auth_errors = authenticate_apis(user_key=user_key)
+    
+    with status:
+        auth_status("msp", "MSP", msp_key, auth_errors.get("msp"))
+        auth_status("user", "User", user_key, auth_errors.get("user"))
+    
     # Route to appropriate page
-    if page == "📦 MSP: Dashboard":
-        display_enboxes_list(msp_client)
-    elif page == "➕ MSP: Create Enbox":
-        create_enbox_form(msp_client)
-    elif page == "📊 MSP: Statistics":
-        display_msp_statistics(msp_client)
-    elif page == "📬 User: Inbox":
-        display_inbox(user_client)
-    elif page == "✉️ User: Send Email":
-        send_email_form(user_client)
-    elif page == "👤 User: Profile":
-        user_profile_page(user_client)
-    elif page == "🔍 User: Resolve Enbox":
-        resolve_enbox_tool(user_client)
-    elif page == "🏷️ User: Labels":
-        display_labels(user_client)
+    if page in MSP_PAGES:
+        if st.session_state.msp_authenticated:
+            MSP_PAGES[page](get_msp_client(st.session_state.msp_api_key))
+        else:
+            st.error("❌ Could not connect to the MSP API. Check msp_api_key in your secrets.")
+    elif st.session_state.user_authenticated:
+        USER_PAGES[page](get_user_client(st.session_state.user_api_key))
+    else:
+        st.error("❌ Could not connect to the User API. Check user_api_key in your secrets.")
 
 if __name__ == "__main__":
     main()